@@ -86,11 +86,36 @@ async def test_required_headers(call, gate, ok_mock):
     assert gate.connections_count() == 0
 
 
+async def _wait_until(check, *, max_wait, message):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while not await check():
+        assert loop.time() < deadline, message
+        await asyncio.sleep(0.01)
+
+
+async def wait_for_no_pending_requests(monitor_client, *, max_wait=2.0):
+    async def no_pending_requests():
+        metrics = await monitor_client.metrics(
+            path='httpclient.pending-requests',
+        )
+        return metrics.value_at('httpclient.pending-requests', {}) == 0
+
+    await _wait_until(
+        no_pending_requests,
+        max_wait=max_wait,
+        message='Http client requests are still pending',
+    )
+
+
 @pytest.fixture
 async def client_metrics(service_client, monitor_client, gate):
-    # Give metrics and logs from the previous tests some time
-    # to be written out asynchronously.
-    await asyncio.sleep(0.1)
+    # Note: must stay function-scoped, the warmup below separates the metrics
+    # of the current test from the ones of the previous test.
+    #
+    # Requests of the previous tests (e.g. the ones cancelled by deadline)
+    # write out their metrics and logs only upon completion.
+    await wait_for_no_pending_requests(monitor_client)
     # Avoid 'prepare' being accounted in the client metrics diff.
     await service_client.update_server_state()
     return monitor_client.metrics_diff(prefix='httpclient', diff_gauge=True)
@@ -174,6 +199,21 @@ async def test_timeout_expired(
     assert 'clients::http::TimeoutException' in logs[0]['text']
 
 
+async def wait_for_cancelled_attempt(client_metrics, capture, *, max_wait):
+    async def cancelled_attempt_accounted():
+        client_metrics.current = await client_metrics.fetch()
+        cancelled = client_metrics.value_at(
+            'cancelled-by-deadline', {}, default=0,
+        )
+        return bool(cancelled and capture.select(stopwatch_name='external'))
+
+    await _wait_until(
+        cancelled_attempt_accounted,
+        max_wait=max_wait,
+        message='Cancelled attempt was not accounted in time',
+    )
+
+
 @pytest.mark.parametrize(
     'timeout,deadline,attempts',
     [
@@ -209,7 +249,9 @@ async def test_deadline_expired(
 
             # If deadline fires before timeout, metrics and logs will only
             # be written upon hitting timeout.
-            await asyncio.sleep(timeout / 1000 + 0.1)
+            await wait_for_cancelled_attempt(
+                client_metrics, capture, max_wait=timeout / 1000 + 1.0,
+            )
 
     # There might have been >1 attempts, but only 1 of them was cancelled.
     assert client_metrics.value_at('cancelled-by-deadline', {}) == 1
@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import time
 
 import redis
 
@@ -61,7 +60,7 @@ async def test_hard_failover(service_client, redis_cluster_topology):
     # Start the failover
     redis_cluster_topology.get_masters()[0].stop()
     # wait until service detect that shard 0 is broken
-    time.sleep(6)
+    await asyncio.sleep(6)
 
     # Failover starts in ~10 seconds
     for _ in range(FAILOVER_DEADLINE_SEC):
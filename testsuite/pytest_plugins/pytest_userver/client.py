@@ -626,7 +626,8 @@ def _subtract_metrics_snapshots(
         initial: metric_module.MetricsSnapshot,
         diff_gauge: bool,
 ) -> metric_module.MetricsSnapshot:
-    return metric_module.MetricsSnapshot(
+    # pylint: disable=protected-access
+    return metric_module.MetricsSnapshot._from_owned_values(
         {
             path: {
                 _subtract_metrics(path, current_metric, initial, diff_gauge)
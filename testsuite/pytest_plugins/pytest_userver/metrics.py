@@ -8,8 +8,14 @@ testsuite; see
 
 import dataclasses
 import json
+import math
 import typing
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 @dataclasses.dataclass(frozen=True)
 class Metric:
@@ -26,21 +32,20 @@ class Metric:
     labels: typing.Dict[str, str]
     value: float
 
+    def __post_init__(self) -> None:
+        # Labels are not expected to change after construction, so the sorted
+        # tuple is computed once instead of on every set lookup. The hash
+        # itself is not cached, as it must not outlive the process (pickle).
+        object.__setattr__(
+            self, '_labels_tuple', tuple(sorted(self.labels.items())),
+        )
+
     def __hash__(self) -> int:
-        return hash(self.get_labels_tuple())
+        return hash(self._labels_tuple)
 
     def get_labels_tuple(self) -> typing.Tuple:
         """ Returns labels as a tuple of sorted items """
-        return tuple(sorted(self.labels.items()))
-
-
-class _MetricsJSONEncoder(json.JSONEncoder):
-    def default(self, o):  # pylint: disable=method-hidden
-        if isinstance(o, Metric):
-            return dataclasses.asdict(o)
-        if isinstance(o, set):
-            return list(o)
-        return super().default(o)
+        return self._labels_tuple
 
 
 class MetricsSnapshot:
@@ -55,6 +60,12 @@ class MetricsSnapshot:
 
     def __init__(self, values: typing.Mapping[str, typing.Set[Metric]]):
         self._values = values
+        # path -> labels tuple -> metrics, filled lazily by value_at(). Only
+        # used for snapshots that own their values (see _from_owned_values),
+        # as the caller may change the mapping passed to the constructor.
+        self._labels_index: typing.Optional[
+            typing.Dict[str, typing.Dict[typing.Tuple, typing.List[Metric]]]
+        ] = None
 
     def __getitem__(self, path: str) -> typing.Set[Metric]:
         """ Returns a list of metrics by specified path """
@@ -80,6 +91,8 @@ class MetricsSnapshot:
         Compares the snapshot with a dict of metrics or with
         another snapshot
         """
+        if isinstance(other, MetricsSnapshot):
+            return self._values == other._values
         return self._values == other
 
     def __repr__(self) -> str:
@@ -126,7 +139,10 @@ class MetricsSnapshot:
         ), f'No metrics found by path "{path}"'
 
         if labels is not None:
-            entry = {x for x in entry if x.labels == labels}
+            if self._labels_index is not None:
+                entry = self._find_by_labels(path, labels)
+            else:
+                entry = {x for x in entry if x.labels == labels}
             assert (
                 entry or default is not None
             ), f'No metrics found by path "{path}" and labels {labels}'
@@ -157,6 +173,35 @@ class MetricsSnapshot:
         rhs = _flatten_snapshot(other, ignore_zeros=ignore_zeros)
         assert lhs == rhs, _diff_metric_snapshots(lhs, rhs, ignore_zeros)
 
+    # @cond
+    @staticmethod
+    def _from_owned_values(
+            values: typing.Mapping[str, typing.Set[Metric]],
+    ) -> 'MetricsSnapshot':
+        """
+        Construct MetricsSnapshot from a mapping that is not shared with
+        anyone else, so value_at() may index it.
+        """
+        snapshot = MetricsSnapshot(values)
+        snapshot._labels_index = {}
+        return snapshot
+
+    # @endcond
+
+    def _find_by_labels(
+            self, path: str, labels: typing.Dict,
+    ) -> typing.List[Metric]:
+        assert self._labels_index is not None
+        path_index = self._labels_index.get(path)
+        if path_index is None:
+            path_index = {}
+            for metric in self._values.get(path, ()):
+                path_index.setdefault(metric.get_labels_tuple(), []).append(
+                    metric,
+                )
+            self._labels_index[path] = path_index
+        return path_index.get(tuple(sorted(labels.items())), [])
+
     @staticmethod
     def from_json(json_str: str) -> 'MetricsSnapshot':
         """
@@ -167,15 +212,87 @@ class MetricsSnapshot:
                 Metric(labels=element['labels'], value=element['value'])
                 for element in metrics_list
             }
-            for path, metrics_list in json.loads(json_str).items()
+            for path, metrics_list in _json_loads(json_str).items()
         }
-        return MetricsSnapshot(json_data)
+        return MetricsSnapshot._from_owned_values(json_data)
 
     def to_json(self) -> str:
         """
         Serialize to a JSON string
         """
-        return json.dumps(self._values, cls=_MetricsJSONEncoder)
+        return _json_dumps(self._values)
+
+
+# Integer range of orjson, out of range integers are parsed as floats
+_JSON_INT_MIN = -(2 ** 63)
+_JSON_INT_MAX = 2 ** 64 - 1
+
+
+def _json_loads(json_str: typing.Union[str, bytes]) -> typing.Any:
+    # orjson is noticeably faster on large metric dumps; it is optional.
+    # The stdlib json is restricted to what orjson accepts, so that results
+    # do not depend on the environment.
+    if orjson is not None:
+        return orjson.loads(json_str)
+    return json.loads(
+        json_str,
+        parse_int=_json_parse_int,
+        parse_float=_json_parse_float,
+        parse_constant=_json_parse_constant,
+    )
+
+
+def _json_parse_int(literal: str) -> typing.Union[int, float]:
+    value = int(literal)
+    if _JSON_INT_MIN <= value <= _JSON_INT_MAX:
+        return value
+    return float(literal)
+
+
+def _json_parse_float(literal: str) -> float:
+    value = float(literal)
+    if not math.isfinite(value):
+        raise ValueError(f'Number is infinity as a double: {literal}')
+    return value
+
+
+def _json_parse_constant(literal: str) -> typing.NoReturn:
+    raise ValueError(f'Non-finite number is not valid JSON: {literal}')
+
+
+def _json_dumps(values: typing.Mapping[str, typing.Set[Metric]]) -> str:
+    # orjson silently writes non-finite floats as null, reject them (and
+    # integers orjson can not write) upfront for both backends.
+    for metrics in values.values():
+        for metric in metrics:
+            _json_check_value(metric.value)
+    if orjson is not None:
+        return orjson.dumps(
+            values,
+            default=_json_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS,
+        ).decode('utf-8')
+    return json.dumps(
+        values,
+        default=_json_default,
+        separators=(',', ':'),
+        allow_nan=False,
+    )
+
+
+def _json_check_value(value: float) -> None:
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f'Non-finite metric value is not valid JSON: {value}')
+    if isinstance(value, int) and not _JSON_INT_MIN <= value <= _JSON_INT_MAX:
+        raise ValueError(f'Metric value exceeds 64-bit integer range: {value}')
+
+
+def _json_default(o: typing.Any) -> typing.Any:
+    if isinstance(o, Metric):
+        return {'labels': o.labels, 'value': o.value}
+    if isinstance(o, set):
+        return list(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not serializable')
 
 
 _FlattenedSnapshot = typing.Set[typing.Tuple[str, Metric]]
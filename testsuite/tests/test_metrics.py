@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 from pytest_userver import metrics  # pylint: disable=import-error
 import pytest_userver.client
@@ -10,6 +12,36 @@ _ETHALON_METRICS = {
 }
 
 
+@pytest.fixture(name='json_backend', params=['orjson', 'json'])
+def _json_backend(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(metrics, 'orjson', None)
+    elif metrics.orjson is None:
+        pytest.skip('orjson is not installed')
+    return request.param
+
+
+def test_metric_labels_tuple():
+    metric = metrics.Metric(labels={'b': '2', 'a': '1'}, value=1)
+    assert metric.get_labels_tuple() == (('a', '1'), ('b', '2'))
+
+    same_labels = metrics.Metric(labels={'a': '1', 'b': '2'}, value=1)
+    assert hash(metric) == hash(same_labels)
+    assert metric == same_labels
+    assert repr(metric) == "Metric(labels={'b': '2', 'a': '1'}, value=1)"
+
+
+def test_metric_pickle():
+    metric = metrics.Metric(labels={'a': 'b'}, value=1)
+    # No hash of strings in the instance state, it is process-specific.
+    assert set(vars(metric)) == {'labels', 'value', '_labels_tuple'}
+
+    unpickled = pickle.loads(pickle.dumps(metric))
+    assert unpickled == metric
+    assert unpickled in {metric}
+    assert metric in {unpickled}
+
+
 def test_metrics_captured_basic():
     values = metrics.MetricsSnapshot(_ETHALON_METRICS)
     assert values == _ETHALON_METRICS
@@ -143,6 +175,37 @@ def test_metrics_list():
     assert metrics.Metric({'label': 'c'}, value=1) not in values
 
 
+@pytest.mark.parametrize('from_json', [False, True])
+def test_metrics_value_at_same_labels(from_json):
+    values = metrics.MetricsSnapshot(
+        {
+            'sample': {
+                metrics.Metric(labels={'a': 'b', 'c': 'd'}, value=1),
+                metrics.Metric(labels={'c': 'd', 'a': 'b'}, value=2),
+                metrics.Metric(labels={'a': 'b'}, value=3),
+            },
+        },
+    )
+    if from_json:
+        values = metrics.MetricsSnapshot.from_json(values.to_json())
+
+    assert values.value_at('sample', {'a': 'b'}) == 3
+    assert values.value_at('sample', {'a': 'b'}) == 3
+    assert values.value_at('sample', {'a': 'c'}, default=0) == 0
+    with pytest.raises(AssertionError, match='Multiple metrics'):
+        values.value_at('sample', {'c': 'd', 'a': 'b'})
+
+
+def test_metrics_value_at_mapping_changed():
+    mapping = {'sample': {metrics.Metric(labels={'a': 'b'}, value=1)}}
+    values = metrics.MetricsSnapshot(mapping)
+    assert values.value_at('sample', {'a': 'b'}) == 1
+
+    mapping['sample'] = {metrics.Metric(labels={'a': 'b'}, value=5)}
+    assert values.value_at('sample') == 5
+    assert values.value_at('sample', {'a': 'b'}) == 5
+
+
 def test_metrics_list_sample():
     values = metrics.MetricsSnapshot(
         {
@@ -256,7 +319,7 @@ def test_equals_ignore_zeros():
         )
 
 
-def test_metrics_captured_json():
+def test_metrics_captured_json(json_backend):
     json = """{
         "tcp-echo.bytes.read": [{"labels": {}, "value": 334}],
         "tcp-echo.sockets.opened": [{"labels": {}, "value": 1}],
@@ -276,7 +339,7 @@ def test_metrics_captured_json():
     assert values == new_values
 
 
-def test_handmade_metrics_to_json():
+def test_handmade_metrics_to_json(json_backend):
     values = metrics.MetricsSnapshot(
         {
             'tcp-echo.bytes.read': {metrics.Metric(labels={}, value=1)},
@@ -296,6 +359,53 @@ def test_handmade_metrics_to_json():
     assert values == metrics.MetricsSnapshot.from_json(json)
 
 
+@pytest.mark.parametrize('value', ['NaN', 'Infinity', '-Infinity', '1e400'])
+def test_metrics_from_json_non_finite(json_backend, value):
+    with pytest.raises(ValueError):
+        metrics.MetricsSnapshot.from_json(
+            f'{{"sample": [{{"labels": {{}}, "value": {value}}}]}}',
+        )
+
+
+def test_metrics_from_json_large_int(json_backend):
+    values = metrics.MetricsSnapshot.from_json(
+        """{
+        "uint64-max": [{"labels": {}, "value": 18446744073709551615}],
+        "int64-min": [{"labels": {}, "value": -9223372036854775808}],
+        "too-large": [{"labels": {}, "value": 18446744073709551616}]
+    }""",
+    )
+    assert values.value_at('uint64-max') == 2 ** 64 - 1
+    assert values.value_at('int64-min') == -(2 ** 63)
+    assert isinstance(values.value_at('too-large'), float)
+
+
+@pytest.mark.parametrize(
+    'value',
+    [float('nan'), float('inf'), float('-inf'), 2 ** 64, -(2 ** 63) - 1],
+)
+def test_metrics_to_json_out_of_range(json_backend, value):
+    values = metrics.MetricsSnapshot(
+        {'sample': {metrics.Metric(labels={}, value=value)}},
+    )
+    with pytest.raises(ValueError):
+        values.to_json()
+
+
+def test_metrics_to_json_same_text(monkeypatch):
+    if metrics.orjson is None:
+        pytest.skip('orjson is not installed')
+    values = metrics.MetricsSnapshot(
+        {
+            'sample': {metrics.Metric(labels={'a': 'b'}, value=1.5)},
+            'uint64-max': {metrics.Metric(labels={}, value=2 ** 64 - 1)},
+        },
+    )
+    orjson_text = values.to_json()
+    monkeypatch.setattr(metrics, 'orjson', None)
+    assert values.to_json() == orjson_text
+
+
 def test_differ():
     # Note: private API, do not construct MetricsDiffer like this!
     differ = pytest_userver.client.MetricsDiffer(